@@ -5,90 +5,251 @@ ShipStation CLI - Fetch current orders from ShipStation API
 
 import argparse
 import base64
+import functools
+import io
 import json
 import os
+import random
 import sqlite3
 import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from urllib.parse import quote
-from urllib.request import Request, urlopen
+from http.client import HTTPException, HTTPSConnection, RemoteDisconnected
+from urllib.parse import quote, unquote, urlencode, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
 from urllib.error import HTTPError, URLError
 
 
 SHIPSTATION_API_URL = "https://ssapi.shipstation.com"
+SLACK_API_URL = "https://slack.com/api"
+SLACK_MAX_WORKERS = 8
+# Slack allows about one message per second per channel, with short bursts. Posts within a
+# burst start together, so Slack may show those few slightly out of order.
+SLACK_RATE_LIMIT = 1.0
+SLACK_BURST = 8
 DEFAULT_DB_PATH = Path.home() / ".shipstation" / "orders.db"
+STORE_CACHE_TTL = 3600
+HTTP_TIMEOUT = 30
+MAX_REDIRECTS = 10
+REDIRECT_CODES = {301, 302, 303, 307, 308}
+
+MAX_CONCURRENT_REQUESTS = 8
+
+# Retry rate-limited (429) and server error (5xx) responses with exponential backoff
+MAX_RETRIES = 6
+RETRY_BASE_DELAY = 1
+RETRY_MIN_DELAY = 0.5
+RETRY_MAX_DELAY = 60
+
+# Idle keep-alive connections reused across requests (and threads), keyed by host
+_idle_connections = {}
+_pool_lock = threading.Lock()
+
+
+def _new_connection(host: str) -> HTTPSConnection:
+    """Open a connection to host, tunnelling through the HTTPS proxy from the environment if set."""
+    proxy = getproxies().get("https")
+    if not proxy or proxy_bypass(host):
+        return HTTPSConnection(host, timeout=HTTP_TIMEOUT)
+
+    proxy_parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    tunnel_headers = {}
+    if proxy_parts.username:
+        credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+        tunnel_headers["Proxy-Authorization"] = f"Basic {base64.b64encode(credentials.encode()).decode()}"
+
+    conn = HTTPSConnection(proxy_parts.hostname, proxy_parts.port or 80, timeout=HTTP_TIMEOUT)
+    conn.set_tunnel(host, headers=tunnel_headers)
+    return conn
 
 
-def send_slack_message(token: str, channel: str, order: dict, store_map: dict = None, test: bool = False) -> bool:
-    """Send an order notification to Slack using the API."""
-    order_number = order.get("orderNumber", "N/A")
-    store_id = order.get("advancedOptions", {}).get("storeId")
-    store_name = store_map.get(store_id, "Unknown") if store_map else "Unknown"
+def _checkout_connection(host: str) -> tuple:
+    """Take an idle connection to host from the pool, or open a new one. Returns (conn, reused)."""
+    with _pool_lock:
+        idle = _idle_connections.get(host)
+        if idle:
+            return idle.pop(), True
+    return _new_connection(host), False
 
-    customer = order.get("shipTo", {})
-    customer_name = customer.get("name", "N/A")
-    street = customer.get("street1", "")
-    city = customer.get("city", "").title()
-    state = customer.get("state", "")
-    postal = customer.get("postalCode", "")
-    country = customer.get("country", "")
 
-    location_display = ", ".join(p for p in [city, state, country] if p)
-    full_address = ", ".join(p for p in [street, city, state, postal, country] if p)
-    maps_url = f"https://www.google.com/maps/search/?api=1&query={quote(full_address)}"
-    location = f"<{maps_url}|{location_display}>"
+def _checkin_connection(host: str, conn: HTTPSConnection) -> None:
+    """Return a connection to the pool for reuse."""
+    with _pool_lock:
+        _idle_connections.setdefault(host, []).append(conn)
 
-    total = order.get("orderTotal", 0)
-    items = order.get("items", [])
 
-    order_icon = "⚠️ [TEST]" if test else "📦"
-    items_text = "\n\n".join(
-        f">*{item.get('quantity', 1)}x {item.get('name', 'Item')}*\n>_SKU: {item.get('sku', '')}_"
-        for item in items
-    )
+def http_request(url: str, headers: dict, data: bytes = None, redirects: int = MAX_REDIRECTS) -> bytes:
+    """Make an HTTPS request over a pooled keep-alive connection and return the response body.
 
-    payload = {
-        "channel": channel,
-        "unfurl_links": False,
-        "unfurl_media": False,
-        "blocks": [
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"{order_icon} *#{order_number}* · {store_name} · ${total:.2f}\n\n"
-                            f"{customer_name}\n"
-                            f"{location}"
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": items_text
+    Like urlopen, honors HTTPS_PROXY/NO_PROXY and follows redirects for GET requests.
+    Raises HTTPError for non-2xx responses and URLError if the connection fails.
+    """
+    parts = urlsplit(url)
+    host = parts.netloc
+    path = parts.path or "/"
+    if parts.query:
+        path += f"?{parts.query}"
+    method = "GET" if data is None else "POST"
+
+    while True:
+        conn, reused = _checkout_connection(host)
+        try:
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+            except (RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # A reused connection the server closed while idle fails this way before any
+                # status line arrives, so the request was never handled and can be resent on a
+                # fresh connection. Other failures (timeouts especially) may mean the server
+                # already acted on it, and resending a POST would duplicate the Slack message.
+                conn.close()
+                if reused:
+                    continue
+                raise
+            body = response.read()
+            break
+        except (HTTPException, OSError) as e:
+            conn.close()
+            raise URLError(e) from e
+
+    if response.will_close:
+        conn.close()
+    else:
+        _checkin_connection(host, conn)
+
+    location = response.headers.get("Location")
+    if response.status in REDIRECT_CODES and location and data is None and redirects > 0:
+        return http_request(urljoin(url, location), headers, redirects=redirects - 1)
+
+    if not 200 <= response.status < 300:
+        raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+    return body
+
+
+def close_connections() -> None:
+    """Close all pooled HTTP connections."""
+    with _pool_lock:
+        for idle in _idle_connections.values():
+            for conn in idle:
+                conn.close()
+        _idle_connections.clear()
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing rate calls per second, with bursts of up to capacity."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a call is allowed."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve a token; if the bucket is empty, wait until it refills
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class SlackPoster:
+    """Posts order notifications to a Slack channel.
+
+    Headers, the endpoint URL and the channel rate limiter are built once and shared by
+    every message, so post() only has to build the per-order payload.
+    """
+
+    def __init__(self, token: str, channel: str, store_map: dict = None, test: bool = False):
+        self.channel = channel
+        # Read-only, so worker threads can share it; the " · Store · " header text is built once per store
+        self.store_prefixes = types.MappingProxyType({
+            store_id: f" · {store_name} · " for store_id, store_name in (store_map or {}).items()
+        })
+        self.order_icon = "⚠️ [TEST]" if test else "📦"
+        self.url = f"{SLACK_API_URL}/chat.postMessage"
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}"
+        }
+        self.rate_limiter = RateLimiter(SLACK_RATE_LIMIT, SLACK_BURST)
+
+    def build_payload(self, order: dict) -> dict:
+        """Build the chat.postMessage payload for an order."""
+        order_number = order.get("orderNumber", "N/A")
+        store_id = order.get("advancedOptions", {}).get("storeId")
+        store_prefix = self.store_prefixes.get(store_id, " · Unknown · ")
+
+        customer = order.get("shipTo", {})
+        customer_name = customer.get("name", "N/A")
+        street = customer.get("street1", "")
+        city = customer.get("city", "").title()
+        state = customer.get("state", "")
+        postal = customer.get("postalCode", "")
+        country = customer.get("country", "")
+
+        location_display = ", ".join(p for p in [city, state, country] if p)
+        full_address = ", ".join(p for p in [street, city, state, postal, country] if p)
+        maps_url = f"https://www.google.com/maps/search/?api=1&query={quote(full_address)}"
+        location = f"<{maps_url}|{location_display}>"
+
+        total = order.get("orderTotal", 0)
+        items = order.get("items", [])
+
+        items_text = "\n\n".join(
+            f">*{item.get('quantity', 1)}x {item.get('name', 'Item')}*\n>_SKU: {item.get('sku', '')}_"
+            for item in items
+        )
+
+        return {
+            "channel": self.channel,
+            "unfurl_links": False,
+            "unfurl_media": False,
+            "blocks": [
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"{self.order_icon} *#{order_number}*{store_prefix}${total:.2f}\n\n"
+                                f"{customer_name}\n"
+                                f"{location}"
+                    }
+                },
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": items_text
+                    }
                 }
-            }
-        ]
-    }
+            ]
+        }
 
-    data = json.dumps(payload).encode("utf-8")
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-    request = Request("https://slack.com/api/chat.postMessage", data=data, headers=headers)
+    def post(self, order: dict) -> bool:
+        """Send an order notification to Slack. Safe to call from multiple threads.
 
-    try:
-        with urlopen(request) as response:
-            result = json.loads(response.read().decode())
+        Callers sending several messages should acquire rate_limiter before each post.
+        """
+        data = json.dumps(self.build_payload(order), separators=(",", ":")).encode("utf-8")
+
+        try:
+            result = json.loads(http_request(self.url, self.headers, data))
             if not result.get("ok"):
                 print(f"Slack API error: {result.get('error')}", file=sys.stderr)
                 return False
             return True
-    except (HTTPError, URLError) as e:
-        print(f"Error sending to Slack: {e}", file=sys.stderr)
-        return False
+        except (HTTPError, URLError) as e:
+            print(f"Error sending to Slack: {e}", file=sys.stderr)
+            return False
 
 
 def get_db_connection(db_path: Path = None) -> sqlite3.Connection:
@@ -96,9 +257,14 @@ def get_db_connection(db_path: Path = None) -> sqlite3.Connection:
     db_path = db_path or DEFAULT_DB_PATH
     db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
+    # Order pagination may check seen orders from worker threads; callers serialize access
+    conn = sqlite3.connect(db_path, check_same_thread=False)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA busy_timeout=5000")
+    # The database is a re-creatable cache, so trade some durability for write throughput
+    for pragma in ("synchronous=NORMAL", "temp_store=MEMORY", "cache_size=-20000",
+                   "mmap_size=268435456", "wal_autocheckpoint=1000"):
+        conn.execute(f"PRAGMA {pragma}")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS seen_orders (
             order_id INTEGER PRIMARY KEY,
@@ -107,61 +273,111 @@ def get_db_connection(db_path: Path = None) -> sqlite3.Connection:
             order_date TEXT,
             store_id INTEGER,
             customer_name TEXT,
-            order_total REAL
+            order_total REAL,
+            last_seen_at TEXT
+        )
+    """)
+    # Databases created before last_seen_at was tracked
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(seen_orders)")}
+    if "last_seen_at" not in columns:
+        conn.execute("ALTER TABLE seen_orders ADD COLUMN last_seen_at TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_store_date ON seen_orders(store_id, order_date)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stores (
+            store_id INTEGER PRIMARY KEY,
+            store_name TEXT,
+            fetched_at TEXT
         )
     """)
     conn.commit()
     return conn
 
 
-def get_seen_order_ids(conn: sqlite3.Connection) -> set:
-    """Get set of all previously seen order IDs."""
-    cursor = conn.execute("SELECT order_id FROM seen_orders")
-    return {row[0] for row in cursor.fetchall()}
+def get_new_order_ids(conn: sqlite3.Connection, order_ids: list) -> set:
+    """Get the subset of order_ids that have not been seen before."""
+    # Stage the IDs in a temp table so SQLite can diff them against the index in one query
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS fetched_orders (order_id INTEGER PRIMARY KEY)")
+    with conn:
+        conn.execute("DELETE FROM fetched_orders")
+        conn.executemany(
+            "INSERT OR IGNORE INTO fetched_orders (order_id) VALUES (?)",
+            [(order_id,) for order_id in order_ids if order_id is not None]
+        )
+        cursor = conn.execute("SELECT order_id FROM fetched_orders EXCEPT SELECT order_id FROM seen_orders")
+        return {row[0] for row in cursor}
 
 
 def mark_orders_seen(conn: sqlite3.Connection, orders: list) -> None:
-    """Mark orders as seen in the database."""
+    """Mark orders as seen in the database, updating last_seen_at for orders seen before."""
     now = datetime.now().isoformat()
-    for order in orders:
-        conn.execute("""
-            INSERT OR IGNORE INTO seen_orders
-            (order_id, order_number, first_seen_at, order_date, store_id, customer_name, order_total)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+    rows = [
+        (
             order.get("orderId"),
             order.get("orderNumber"),
             now,
             order.get("orderDate"),
             order.get("advancedOptions", {}).get("storeId"),
             order.get("shipTo", {}).get("name"),
-            order.get("orderTotal", 0)
-        ))
-    conn.commit()
+            order.get("orderTotal", 0),
+            now
+        )
+        for order in orders
+    ]
+    # Upsert the whole batch in a single transaction
+    with conn:
+        conn.executemany("""
+            INSERT INTO seen_orders
+            (order_id, order_number, first_seen_at, order_date, store_id, customer_name, order_total, last_seen_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(order_id) DO UPDATE SET last_seen_at = excluded.last_seen_at
+        """, rows)
+
+
+def retry_delay(attempt: int, headers=None) -> float:
+    """Seconds to wait before retry number attempt (0-based).
+
+    Uses exponential backoff with full jitter. For 429 responses, pass the response
+    headers: the server's Retry-After (or ShipStation's X-Rate-Limit-Reset) wait is
+    honored and the jitter added on top, so concurrent workers don't retry in lockstep.
+    Never returns less than RETRY_MIN_DELAY.
+    """
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    for name in ("Retry-After", "X-Rate-Limit-Reset"):
+        value = headers.get(name) if headers else None
+        if value:
+            try:
+                delay += min(max(float(value), 0), RETRY_MAX_DELAY)
+                break
+            except ValueError:
+                pass
+    return max(delay, RETRY_MIN_DELAY)
 
 
 def api_request(url: str, api_key: str, api_secret: str) -> dict:
-    """Make an authenticated request to ShipStation API."""
+    """Make an authenticated request to ShipStation API, retrying on 429 and 5xx responses."""
     headers = {
         "Authorization": get_auth_header(api_key, api_secret),
         "Content-Type": "application/json",
     }
-    request = Request(url, headers=headers)
 
-    try:
-        with urlopen(request) as response:
-            return json.loads(response.read().decode())
-    except HTTPError as e:
-        if e.code == 401:
-            print("Error: Invalid API credentials", file=sys.stderr)
-        elif e.code == 429:
-            print("Error: Rate limit exceeded. Please wait and try again.", file=sys.stderr)
-        else:
-            print(f"Error: HTTP {e.code} - {e.reason}", file=sys.stderr)
-        sys.exit(1)
-    except URLError as e:
-        print(f"Error: Unable to connect to ShipStation API - {e.reason}", file=sys.stderr)
-        sys.exit(1)
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return json.loads(http_request(url, headers))
+        except HTTPError as e:
+            if (e.code == 429 or e.code >= 500) and attempt < MAX_RETRIES:
+                # ShipStation sends rate limit headers on every response; they only apply to 429s
+                time.sleep(retry_delay(attempt, e.headers if e.code == 429 else None))
+                continue
+            if e.code == 401:
+                print("Error: Invalid API credentials", file=sys.stderr)
+            elif e.code == 429:
+                print("Error: Rate limit exceeded. Please wait and try again.", file=sys.stderr)
+            else:
+                print(f"Error: HTTP {e.code} - {e.reason}", file=sys.stderr)
+            sys.exit(1)
+        except URLError as e:
+            print(f"Error: Unable to connect to ShipStation API - {e.reason}", file=sys.stderr)
+            sys.exit(1)
 
 
 def get_auth_header(api_key: str, api_secret: str) -> str:
@@ -178,44 +394,120 @@ def fetch_stores(api_key: str, api_secret: str) -> dict:
     return {store["storeId"]: store["storeName"] for store in stores}
 
 
+def load_cached_stores(conn: sqlite3.Connection, api_key: str, api_secret: str,
+                       max_age_s: int = STORE_CACHE_TTL) -> tuple:
+    """Get the store ID to name map from the database, refreshing it from the API if stale.
+
+    Returns (store_map, fetched), where fetched is True if the map came from the API.
+    """
+    row = conn.execute("SELECT MAX(fetched_at) FROM stores").fetchone()
+    if row[0] and (datetime.now() - datetime.fromisoformat(row[0])).total_seconds() < max_age_s:
+        return dict(conn.execute("SELECT store_id, store_name FROM stores")), False
+
+    store_map = fetch_stores(api_key, api_secret)
+    now = datetime.now().isoformat()
+    # Replace the whole cache so deleted stores drop out
+    with conn:
+        conn.execute("DELETE FROM stores")
+        conn.executemany(
+            "INSERT INTO stores (store_id, store_name, fetched_at) VALUES (?, ?, ?)",
+            [(store_id, store_name, now) for store_id, store_name in store_map.items()]
+        )
+    return store_map, True
+
+
 def fetch_orders(api_key: str, api_secret: str, status: str = None,
-                 store_id: int = None, debug: bool = False) -> list:
-    """Fetch all orders from ShipStation API, handling pagination."""
-    base_params = ["pageSize=500", "sortBy=CreateDate", "sortDir=DESC"]
+                 store_id: int = None, country: str = None, debug: bool = False,
+                 executor: ThreadPoolExecutor = None, stop_predicate=None,
+                 sort_by: str = "CreateDate") -> list:
+    """Fetch all orders from ShipStation API, handling pagination.
+
+    The first page reports the page count; remaining pages are fetched concurrently
+    on executor (or a private pool if none is given). When executor is given, every page
+    request runs on it, so its worker count caps concurrent requests across callers. If stop_predicate is given, pages
+    are fetched in order instead and pagination stops after the first page for which
+    stop_predicate(page_orders) returns True.
+
+    The country filter is applied as each page arrives, so only matching orders are kept.
+    """
+    params = [("pageSize", 500), ("sortBy", sort_by), ("sortDir", "DESC")]
 
     if status:
-        base_params.append(f"orderStatus={status}")
+        params.append(("orderStatus", status))
 
     if store_id:
-        base_params.append(f"storeId={store_id}")
+        params.append(("storeId", store_id))
 
-    all_orders = []
-    page = 1
+    # Only the page number changes between requests
+    url_prefix = f"{SHIPSTATION_API_URL}/orders?{urlencode(params)}&page="
 
-    while True:
-        params = base_params + [f"page={page}"]
-        url = f"{SHIPSTATION_API_URL}/orders?" + "&".join(params)
+    def fetch_page(page: int) -> tuple:
+        """Fetch a single page. Returns (orders, page count)."""
+        url = f"{url_prefix}{page}"
         result = api_request(url, api_key, api_secret)
 
         orders = result.get("orders", [])
-        all_orders.extend(orders)
-
         total = result.get("total", 0)
         pages = result.get("pages", 1)
 
         if debug:
             print(f"[DEBUG] Page {page}/{pages}: fetched {len(orders)} orders (total: {total})", file=sys.stderr)
 
-        if page >= pages:
-            break
-        page += 1
+        if country:
+            fetched_count = len(orders)
+            filtered_orders = []
+            for order in orders:
+                order_country = order.get("shipTo", {}).get("country", "").upper()
+                if order_country == country:
+                    filtered_orders.append(order)
+                elif debug:
+                    print(f"[DEBUG] Order #{order.get('orderNumber')} excluded: country='{order_country}'", file=sys.stderr)
+            orders = filtered_orders
+            if debug:
+                print(f"[DEBUG] Page {page}/{pages}: country filter {fetched_count} -> {len(orders)} orders", file=sys.stderr)
+        return orders, pages
+
+    def fetch_page_on_executor(page: int) -> tuple:
+        """Fetch a single page on executor, if given, so it counts toward the worker cap."""
+        if executor is None:
+            return fetch_page(page)
+        return executor.submit(fetch_page, page).result()
+
+    all_orders, pages = fetch_page_on_executor(1)
+    if pages <= 1:
+        return all_orders
+
+    if stop_predicate:
+        # Each page decides whether the next one is needed, so fetch them in order
+        batch = all_orders
+        page = 1
+        while page < pages:
+            # A page with no matching orders says nothing about the pages after it
+            if batch and stop_predicate(batch):
+                if debug:
+                    print(f"[DEBUG] Stopping after page {page}/{pages}", file=sys.stderr)
+                break
+            page += 1
+            batch, pages = fetch_page_on_executor(page)
+            all_orders.extend(batch)
+        return all_orders
+
+    remaining = range(2, pages + 1)
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            results = list(executor.map(fetch_page, remaining))
+    else:
+        results = list(executor.map(fetch_page, remaining))
+
+    # executor.map preserves page order, so the combined list stays sorted
+    for orders, _ in results:
+        all_orders.extend(orders)
 
     return all_orders
 
 
 def format_order(order: dict, verbose: bool = False, is_new: bool = False) -> str:
     """Format a single order for display."""
-    order_id = order.get("orderId", "N/A")
     order_number = order.get("orderNumber", "N/A")
     status = order.get("orderStatus", "N/A")
     order_date = order.get("orderDate", "N/A")
@@ -226,34 +518,32 @@ def format_order(order: dict, verbose: bool = False, is_new: bool = False) -> st
     customer_name = customer.get("name", "N/A")
 
     total = order.get("orderTotal", 0)
-    items_count = len(order.get("items", []))
+    items = order.get("items", [])
 
     new_marker = "[NEW] " if is_new else ""
-    output = f"{new_marker}#{order_number} | {status} | {order_date} | {customer_name} | ${total:.2f} | {items_count} item(s)"
+    lines = [f"{new_marker}#{order_number} | {status} | {order_date} | {customer_name} | ${total:.2f} | {len(items)} item(s)"]
 
     if verbose:
-        output += "\n  Items:"
-        for item in order.get("items", []):
-            sku = item.get("sku", "N/A")
-            name = item.get("name", "N/A")
-            qty = item.get("quantity", 0)
-            output += f"\n    - [{sku}] {name} x{qty}"
+        lines.append("  Items:")
+        lines.extend(
+            f"    - [{item.get('sku', 'N/A')}] {item.get('name', 'N/A')} x{item.get('quantity', 0)}"
+            for item in items
+        )
 
         shipping = order.get("requestedShippingService", "N/A")
-        output += f"\n  Shipping: {shipping}"
+        lines.append(f"  Shipping: {shipping}")
 
-        address = customer
-        if address:
+        if customer:
             addr_parts = [
-                address.get("street1", ""),
-                address.get("street2", ""),
-                f"{address.get('city', '')}, {address.get('state', '')} {address.get('postalCode', '')}",
-                address.get("country", "")
+                customer.get("street1", ""),
+                customer.get("street2", ""),
+                f"{customer.get('city', '')}, {customer.get('state', '')} {customer.get('postalCode', '')}",
+                customer.get("country", "")
             ]
             addr_str = ", ".join(p for p in addr_parts if p.strip())
-            output += f"\n  Ship To: {addr_str}"
+            lines.append(f"  Ship To: {addr_str}")
 
-    return output
+    return "\n".join(lines)
 
 
 def main():
@@ -353,9 +643,12 @@ Examples:
         print("Error: --slack requires SLACK_BOT_TOKEN and SLACK_CHANNEL environment variables.", file=sys.stderr)
         sys.exit(1)
 
-    # List stores
+    conn = get_db_connection()
+
+    # List stores (always fresh, which also refreshes the cache)
     if args.list_stores:
-        store_map = fetch_stores(api_key, api_secret)
+        store_map, _ = load_cached_stores(conn, api_key, api_secret, max_age_s=0)
+        conn.close()
         print("Available stores:")
         print("-" * 50)
         for store_id, store_name in sorted(store_map.items(), key=lambda x: x[1]):
@@ -364,7 +657,7 @@ Examples:
 
     # Fetch specific order by order number
     if args.order:
-        url = f"{SHIPSTATION_API_URL}/orders?orderNumber={args.order}"
+        url = f"{SHIPSTATION_API_URL}/orders?{urlencode({'orderNumber': args.order})}"
         result = api_request(url, api_key, api_secret)
         orders = result.get("orders", [])
         if not orders:
@@ -373,24 +666,37 @@ Examples:
         order = orders[0]
         print(json.dumps(order, indent=2))
         if args.slack:
-            store_map = fetch_stores(api_key, api_secret)
-            if send_slack_message(slack_token, slack_channel, order, store_map, args.test):
+            store_map, _ = load_cached_stores(conn, api_key, api_secret)
+            slack = SlackPoster(slack_token, slack_channel, store_map, args.test)
+            if slack.post(order):
                 print("Sent order to Slack")
             else:
                 print("Failed to send order to Slack", file=sys.stderr)
+        conn.close()
         return
 
     status = None if args.status == "all" else args.status
 
+    # Stores are only loaded once something needs them, so empty Slack runs skip the lookup
+    @functools.cache
+    def load_stores() -> tuple:
+        return load_cached_stores(conn, api_key, api_secret)
+
+    def get_store_map() -> dict:
+        return load_stores()[0]
+
     # Resolve store names to IDs for server-side filtering
     store_ids = []
-    store_map = {}
-    if args.stores or args.slack:
-        store_map = fetch_stores(api_key, api_secret)
     if args.stores:
         # Create reverse map: name -> id
+        store_map, fetched = load_stores()
         name_to_id = {name.lower(): sid for sid, name in store_map.items()}
         store_names = [s.strip().lower() for s in args.stores.split(",")]
+        if not fetched and any(name not in name_to_id for name in store_names):
+            # The cache may predate a newly added store, so refresh it before giving up
+            load_cached_stores(conn, api_key, api_secret, max_age_s=0)
+            load_stores.cache_clear()
+            name_to_id = {name.lower(): sid for sid, name in get_store_map().items()}
         for name in store_names:
             if name in name_to_id:
                 store_ids.append(name_to_id[name])
@@ -400,89 +706,111 @@ Examples:
             print(f"[DEBUG] Store names: {store_names} -> Store IDs: {store_ids}", file=sys.stderr)
 
     # Fetch orders (with server-side store filtering)
+    country = args.country.upper() if args.country else None
     if args.debug:
         print(f"[DEBUG] Fetching orders: status={status}", file=sys.stderr)
+        if country:
+            print(f"[DEBUG] Filtering by country: {country}", file=sys.stderr)
+
+    # With --new-only, sort by modify date: an order that was created earlier but only just
+    # entered the requested status (payment cleared, hold released) moves back to the top.
+    # A page of already-seen orders then means the remaining pages hold nothing new.
+    sort_by = "CreateDate"
+    stop_predicate = None
+    if args.new_only:
+        sort_by = "ModifyDate"
+        db_lock = threading.Lock()
+
+        def all_seen(batch: list) -> bool:
+            with db_lock:
+                return not get_new_order_ids(conn, [o.get("orderId") for o in batch])
+
+        stop_predicate = all_seen
 
     orders = []
     if len(store_ids) == 1:
         # Single store
-        orders = fetch_orders(api_key, api_secret, status, store_id=store_ids[0], debug=args.debug)
+        orders = fetch_orders(api_key, api_secret, status, store_id=store_ids[0], country=country,
+                              debug=args.debug, stop_predicate=stop_predicate, sort_by=sort_by)
     elif len(store_ids) > 1:
-        # Multiple stores - make separate API calls
-        for sid in store_ids:
-            store_orders = fetch_orders(api_key, api_secret, status, store_id=sid, debug=args.debug)
-            orders.extend(store_orders)
-        # Sort combined results by create date descending
-        orders.sort(key=lambda o: o.get("createDate", ""), reverse=True)
+        # Multiple stores - fetch stores concurrently; every page request runs on the shared
+        # page pool, which caps in-flight requests at MAX_CONCURRENT_REQUESTS
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as page_pool, \
+                ThreadPoolExecutor(max_workers=len(store_ids)) as store_pool:
+            for store_orders in store_pool.map(
+                lambda sid: fetch_orders(api_key, api_secret, status, store_id=sid, country=country,
+                                         debug=args.debug, executor=page_pool,
+                                         stop_predicate=stop_predicate, sort_by=sort_by),
+                store_ids
+            ):
+                orders.extend(store_orders)
     else:
         # No store filter
-        orders = fetch_orders(api_key, api_secret, status, debug=args.debug)
+        orders = fetch_orders(api_key, api_secret, status, country=country, debug=args.debug,
+                              stop_predicate=stop_predicate, sort_by=sort_by)
 
-    # Filter by country if specified
-    if args.country:
-        country = args.country.upper()
-        if args.debug:
-            print(f"[DEBUG] Filtering by country: {country}", file=sys.stderr)
-        before_count = len(orders)
-        filtered_orders = []
-        for order in orders:
-            order_country = order.get("shipTo", {}).get("country", "").upper()
-            if order_country == country:
-                filtered_orders.append(order)
-            elif args.debug:
-                print(f"[DEBUG] Order #{order.get('orderNumber')} excluded: country='{order_country}'", file=sys.stderr)
-        orders = filtered_orders
-        if args.debug:
-            print(f"[DEBUG] Country filter: {before_count} -> {len(orders)} orders", file=sys.stderr)
+    if len(store_ids) > 1 or sort_by != "CreateDate":
+        # Sort combined results by create date descending
+        orders.sort(key=lambda o: o.get("createDate", ""), reverse=True)
 
     # Check for new orders using database
-    conn = get_db_connection()
-    seen_ids = get_seen_order_ids(conn)
-    new_order_ids = set()
+    new_ids = get_new_order_ids(conn, [o.get("orderId") for o in orders])
 
+    # Annotate orders as new in a single pass, dropping seen ones if requested
+    annotated = []
+    new_count = 0
     for order in orders:
-        order_id = order.get("orderId")
-        if order_id not in seen_ids:
-            new_order_ids.add(order_id)
-
-    # Filter to new only if requested
-    if args.new_only:
-        orders = [o for o in orders if o.get("orderId") in new_order_ids]
+        is_new = order.get("orderId") in new_ids
+        if is_new:
+            new_count += 1
+        elif args.new_only:
+            continue
+        if args.json:
+            order["_isNew"] = is_new
+        annotated.append((order, is_new))
+    # Record every fetched order, so already-seen ones get last_seen_at refreshed under --new-only too
+    fetched_orders = orders
+    orders = [order for order, _ in annotated]
 
     if args.json:
-        for order in orders:
-            order["_isNew"] = order.get("orderId") in new_order_ids
         print(json.dumps({"orders": orders, "total": len(orders)}, indent=2))
-        mark_orders_seen(conn, orders)
+        mark_orders_seen(conn, fetched_orders)
         conn.close()
         return
 
-    new_count = len([o for o in orders if o.get("orderId") in new_order_ids])
     print(f"Found {len(orders)} order(s)" + (f" ({new_count} new)" if new_count else ""))
     print("-" * 80)
 
     if not orders:
         print("No orders found.")
+        mark_orders_seen(conn, fetched_orders)
         conn.close()
         return
 
-    slack_count = 0
-    for order in orders:
-        is_new = order.get("orderId") in new_order_ids
+    for order, is_new in annotated:
         print(format_order(order, args.verbose, is_new))
         if args.verbose:
             print()
-        if args.slack:
-            if send_slack_message(slack_token, slack_channel, order, store_map, args.test):
-                slack_count += 1
 
     if args.slack:
+        # Slack posts are independent, so send them concurrently within the channel rate limit
+        slack = SlackPoster(slack_token, slack_channel, get_store_map(), args.test)
+        with ThreadPoolExecutor(max_workers=SLACK_MAX_WORKERS) as executor:
+            futures = []
+            for order in orders:
+                # Take rate limit slots here, in display order, so posts start newest first
+                slack.rate_limiter.acquire()
+                futures.append(executor.submit(slack.post, order))
+            slack_count = sum(future.result() for future in futures)
         print(f"Sent {slack_count} order(s) to Slack")
 
-    # Mark all displayed orders as seen
-    mark_orders_seen(conn, orders)
+    # Mark all fetched orders as seen
+    mark_orders_seen(conn, fetched_orders)
     conn.close()
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        close_connections()